@@ -73,6 +73,11 @@ def delete_missing_values():
             missing_values = preprocessor.get_missing_values(db_path, selected_table)
             return render_template('delete_missing_values.html', tables=tables, selected_table=selected_table, missing_values=missing_values)
         
+        elif request.form.get('action') == 'Estimate Missing Values':
+            sample_size = request.form.get('sample_size', 10000, type=int)
+            missing_values, sample_info = preprocessor.get_approximate_missing_values(db_path, selected_table, sample_size)
+            return render_template('delete_missing_values.html', tables=tables, selected_table=selected_table, missing_values=missing_values, sample_info=sample_info)
+        
         elif request.form.get('action') == 'Delete Missing Values':
             try:
                 preprocessor.handle_missing_values(db_path, selected_table)
@@ -102,8 +107,17 @@ def file_upload():
             try:
                 file_stream = io.StringIO(file.stream.read().decode("UTF8"), newline=None)
                 df = pd.read_csv(file_stream)
-                database.insert_dataframe_to_db(df, table_name)
+                encode_categories = request.form.get('encode_categories') == 'on'
+                database.insert_dataframe_to_db(df, table_name, encode_categories=encode_categories)
                 flash('File successfully uploaded and inserted into the database!')
+                try:
+                    flash(f"Stored in {database.get_table_size(table_name):,} bytes.")
+                    if request.form.get('compare_storage') == 'on':
+                        report = database.compare_ingest_storage(df, table_name, encode_categories=encode_categories)
+                        flash(f"Compared with a plain pandas write: {report['bytes_saved']:,} bytes saved, "
+                              f"{report['scan_speedup']:.2f}x full-scan speed.")
+                except Exception as e:
+                    flash(f'Could not measure the stored table: {str(e)}')
                 return redirect(url_for('index'))
             except Exception as e:
                 flash(f'An error occurred: {str(e)}')
@@ -117,9 +131,7 @@ def file_upload():
 @app.route('/display_top_10', methods=['GET', 'POST'])
 def display_top_10():
     # Fetch the available tables from the database
-    tables_query = "SELECT name FROM sqlite_master WHERE type='table';"
-    tables_df = database.fetch_query(tables_query)  # Assuming fetch_query returns a DataFrame
-    tables = tables_df['name'].tolist()  # Get table names as a list
+    tables = database.get_tables()
     
     selected_table = None
     columns = []
@@ -130,7 +142,7 @@ def display_top_10():
         
         if selected_table:
             # Query to fetch the top 10 records from the selected table
-            query = f"SELECT * FROM {selected_table} LIMIT 10"
+            query = f"{database.get_decoded_query(selected_table)} LIMIT 10"
             df = database.fetch_query(query)
             columns = df.columns.tolist()
             data = df.to_dict(orient="records")
@@ -171,14 +183,19 @@ def display_table_metadata():
 def table_summary_statistics():
     tables = statistics_db.get_tables()
     stats = None
+    sample_info = None
     selected_table = None
     
     if request.method == 'POST':
         selected_table = request.form.get('table')
         if selected_table:
-            stats = statistics_db.get_summary_statistics(selected_table)
+            if request.form.get('mode') == 'approximate':
+                sample_size = request.form.get('sample_size', 10000, type=int)
+                stats, sample_info = statistics_db.get_approximate_summary_statistics(selected_table, sample_size)
+            else:
+                stats = statistics_db.get_summary_statistics(selected_table)
     
-    return render_template('table_summary_statistics.html', tables=tables, stats=stats, selected_table=selected_table)
+    return render_template('table_summary_statistics.html', tables=tables, stats=stats, selected_table=selected_table, sample_info=sample_info)
 
 
 if __name__ == '__main__':
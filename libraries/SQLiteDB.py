@@ -1,8 +1,33 @@
 import sqlite3
 import pandas as pd
 import os
+import random
+import time
+from statistics import NormalDist
+import numpy as np
 from flask import g
 
+# Date formats accepted on ingest; a column is only treated as a date when exactly one of them
+# parses every sampled value, so ambiguous day/month orders are kept as text.
+DATE_FORMATS = [
+    '%Y-%m-%d',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%d %H:%M:%S.%f',
+    '%Y-%m-%dT%H:%M:%S',
+    '%Y-%m-%dT%H:%M:%S.%f',
+    '%Y/%m/%d',
+    '%m/%d/%Y',
+    '%d/%m/%Y',
+]
+
+# Lookup tables for dictionary-encoded columns share a reserved prefix so they can be hidden from table
+# lists, and are recorded in a registry table that maps each encoded column to its lookup table.
+LOOKUP_TABLE_PREFIX = 'lookup__'
+LOOKUP_REGISTRY_TABLE = 'lookup__columns'
+
+# Random rowid sampling gives up after drawing this many rowids per requested record.
+SAMPLE_DRAW_BUDGET = 10
+
 class SQLiteDB:
     
     def __init__(self, db_path):
@@ -84,9 +109,9 @@ class SQLiteDB:
             conn.rollback()
             raise Exception(f"Failed to update column type: {e}")
 
-    def get_tables(self):
+    def get_all_table_names(self):
         """
-        Retrieves a list of all tables in the SQLite database.
+        Retrieves a list of all tables in the SQLite database, including lookup tables.
 
         Returns:
         list: A list of table names in the database.
@@ -96,6 +121,15 @@ class SQLiteDB:
         tables_df = pd.read_sql_query(query, conn)
         return tables_df['name'].tolist()
 
+    def get_tables(self):
+        """
+        Retrieves a list of the data tables in the SQLite database, leaving out lookup tables.
+
+        Returns:
+        list: A list of table names in the database.
+        """
+        return [table for table in self.get_all_table_names() if not table.startswith(LOOKUP_TABLE_PREFIX)]
+
     def fetch_table_columns(self, table_name):
         """
         Retrieves the column names of a specific table.
@@ -159,6 +193,136 @@ class SQLiteDB:
         conn = self.connect()
         return pd.read_sql_query(query, conn)
 
+    def sample_table(self, table_name, sample_size=10000, confidence=0.95):
+        """
+        Fetches a uniform random sample of records from a table by looking up random rowids.
+
+        Rowids are drawn without replacement from the range between the smallest and largest rowid, so every
+        stored record is equally likely to be sampled even when deletions have left gaps. Draws that miss are
+        topped up until the sample is full or SAMPLE_DRAW_BUDGET times the sample size has been drawn. If the
+        rowids are so sparse that fewer than half the requested records were found, the sample is instead
+        drawn from the list of existing rowids, which also gives the exact record count.
+        Tables that fit within the sample size are read in full, and sample sizes below 1 are raised to 1.
+
+        Parameters:
+        table_name (str): Name of the table to sample records from.
+        sample_size (int): The number of records to sample.
+        confidence (float): The confidence level of the interval on the number of records.
+
+        Returns:
+        tuple: A DataFrame of the sampled records and a dictionary describing the sample: 'sample_rows',
+        'estimated_rows' with its 'rows_lower' and 'rows_upper' bounds, and 'exact' (True if the whole
+        table was read).
+        """
+        sample_size = max(int(sample_size), 1)
+        conn = self.connect()
+        min_rowid, max_rowid = conn.execute(f'SELECT MIN(rowid), MAX(rowid) FROM "{table_name}";').fetchone()
+        rowid_span = 0 if min_rowid is None else max_rowid - min_rowid + 1
+        if rowid_span <= sample_size:
+            return self.fetch_table_as_sample(table_name)
+
+        columns = self.fetch_table_columns(table_name)
+        budget = min(rowid_span, SAMPLE_DRAW_BUDGET * sample_size)
+        drawn = set()
+        records = []
+        while len(records) < sample_size and len(drawn) < budget:
+            hit_rate = max(len(records) / len(drawn) if drawn else 1.0, 1 / SAMPLE_DRAW_BUDGET)
+            wanted = min(int(np.ceil((sample_size - len(records)) / hit_rate)), budget - len(drawn))
+            batch = []
+            while len(batch) < wanted:
+                rowid = random.randint(min_rowid, max_rowid)
+                if rowid not in drawn:
+                    drawn.add(rowid)
+                    batch.append(rowid)
+            records.extend(self.fetch_records_by_rowid(table_name, batch))
+
+        if len(records) >= sample_size / 2:
+            z = NormalDist().inv_cdf((1 + confidence) / 2)
+            hit_lower, hit_upper = self.wilson_interval(len(records), len(drawn), z)
+            sample_info = {
+                'sample_rows': len(records),
+                'estimated_rows': round(rowid_span * len(records) / len(drawn)),
+                'rows_lower': int(np.floor(rowid_span * hit_lower)),
+                'rows_upper': int(np.ceil(rowid_span * hit_upper)),
+                'exact': False
+            }
+        else:
+            rowids = [row[0] for row in conn.execute(f'SELECT rowid FROM "{table_name}";').fetchall()]
+            if len(rowids) <= sample_size:
+                return self.fetch_table_as_sample(table_name)
+            records = self.fetch_records_by_rowid(table_name, random.sample(rowids, sample_size))
+            sample_info = {
+                'sample_rows': len(records),
+                'estimated_rows': len(rowids),
+                'rows_lower': len(rowids),
+                'rows_upper': len(rowids),
+                'exact': False
+            }
+
+        df = pd.DataFrame.from_records(records, columns=columns, coerce_float=True)
+        return df, sample_info
+
+    def fetch_table_as_sample(self, table_name):
+        """
+        Fetches all records from a table, described as an exact sample.
+
+        Parameters:
+        table_name (str): Name of the table to fetch records from.
+
+        Returns:
+        tuple: A DataFrame containing all records and a sample description in the format of sample_table.
+        """
+        df = self.fetch_table(table_name)
+        sample_info = {
+            'sample_rows': len(df),
+            'estimated_rows': len(df),
+            'rows_lower': len(df),
+            'rows_upper': len(df),
+            'exact': True
+        }
+        return df, sample_info
+
+    def fetch_records_by_rowid(self, table_name, rowids):
+        """
+        Fetches the decoded records with the given rowids; rowids that do not exist are skipped.
+
+        Parameters:
+        table_name (str): Name of the table to fetch records from.
+        rowids (list): The rowids to look up.
+
+        Returns:
+        list: A list of record tuples in table column order.
+        """
+        conn = self.connect()
+        decoded_query = self.get_decoded_query(table_name)
+        records = []
+        # Stay below SQLite's default limit on the number of bound parameters
+        for start in range(0, len(rowids), 500):
+            chunk = rowids[start:start + 500]
+            placeholders = ', '.join(['?'] * len(chunk))
+            cursor = conn.execute(f'{decoded_query} WHERE base.rowid IN ({placeholders});', chunk)
+            records.extend(tuple(row) for row in cursor.fetchall())
+        return records
+
+    def wilson_interval(self, successes, n, z):
+        """
+        Computes the Wilson score interval for a binomial proportion.
+
+        Parameters:
+        successes (int): The number of successes observed.
+        n (int): The number of trials.
+        z (float): The standard normal quantile of the confidence level.
+
+        Returns:
+        tuple: The lower and upper bounds of the proportion.
+        """
+        if n == 0:
+            return 0.0, 1.0
+        p = successes / n
+        centre = (p + z ** 2 / (2 * n)) / (1 + z ** 2 / n)
+        half_width = z * np.sqrt(p * (1 - p) / n + z ** 2 / (4 * n ** 2)) / (1 + z ** 2 / n)
+        return max(centre - half_width, 0.0), min(centre + half_width, 1.0)
+
     def fetch_table(self, table_name):
         """
         Fetches all records from a specific table.
@@ -170,20 +334,289 @@ class SQLiteDB:
         pd.DataFrame: DataFrame containing all records from the table.
         """
         conn = self.connect()
-        query = f"SELECT * FROM {table_name};"
+        query = f"{self.get_decoded_query(table_name)};"
         return pd.read_sql_query(query, conn)
 
-    def insert_dataframe_to_db(self, df, table_name):
+    def get_decoded_query(self, table_name):
+        """
+        Builds a query that selects all records from a table with its dictionary-encoded columns decoded
+        back to their original strings. The table is aliased as 'base' so callers can append a WHERE clause.
+
+        Parameters:
+        table_name (str): Name of the table to select records from.
+
+        Returns:
+        str: The SELECT statement, without a trailing semicolon.
+        """
+        encoded_columns = self.get_encoded_columns(table_name)
+        select_columns = []
+        joins = []
+        for column in self.fetch_table_columns(table_name):
+            if column in encoded_columns:
+                alias = f"lookup_{len(joins)}"
+                select_columns.append(f'{alias}.value AS "{column}"')
+                joins.append(f' LEFT JOIN "{encoded_columns[column]}" AS {alias} ON {alias}.id = base."{column}"')
+            else:
+                select_columns.append(f'base."{column}"')
+        return f'SELECT {", ".join(select_columns)} FROM "{table_name}" AS base{"".join(joins)}'
+
+    def infer_column_types(self, df, sample_size=1000, encode_categories=False, max_category_ratio=0.5):
+        """
+        Infers a compact SQLite column type for each column of a DataFrame from a sample of its rows.
+
+        Parameters:
+        df (pandas.DataFrame): The DataFrame to analyze.
+        sample_size (int): The number of leading rows used to infer the types.
+        encode_categories (bool): Whether repeated strings may be dictionary-encoded into lookup tables.
+        max_category_ratio (float): The highest distinct-to-total ratio for a string column to be encoded.
+
+        Returns:
+        tuple: A dictionary of column names with one of 'INTEGER', 'REAL', 'DATE', 'CATEGORY' or 'TEXT',
+        and a dictionary of date column names with the format that parses them.
+        """
+        column_types = {}
+        date_formats = {}
+        sample = df.head(sample_size)
+
+        for column in df.columns:
+            values = sample[column].dropna()
+            if pd.api.types.is_bool_dtype(df[column]) or pd.api.types.is_integer_dtype(df[column]):
+                column_types[column] = 'INTEGER'
+            elif pd.api.types.is_float_dtype(df[column]):
+                # Integral columns with missing values are read as floats by pandas
+                column_types[column] = 'INTEGER' if (values == values.round()).all() else 'REAL'
+            elif pd.api.types.is_datetime64_any_dtype(df[column]):
+                column_types[column] = 'DATE'
+                date_formats[column] = None
+            elif values.empty:
+                column_types[column] = 'TEXT'
+            else:
+                text = values.astype(str).str.strip()
+                if text.str.fullmatch(r'-?(0|[1-9][0-9]{0,17})').all():
+                    column_types[column] = 'INTEGER'
+                    continue
+                date_format = self.infer_date_format(text)
+                if date_format is not None:
+                    column_types[column] = 'DATE'
+                    date_formats[column] = date_format
+                elif encode_categories and text.nunique() <= max_category_ratio * len(text):
+                    column_types[column] = 'CATEGORY'
+                else:
+                    column_types[column] = 'TEXT'
+        return column_types, date_formats
+
+    def infer_date_format(self, text):
+        """
+        Finds the single date format that parses every value of a text column.
+
+        Parameters:
+        text (pandas.Series): The non-missing, stripped text values to analyze.
+
+        Returns:
+        str: The matching format from DATE_FORMATS, or None if no format or more than one format matches.
         """
-        Inserts a pandas DataFrame into the SQLite database.
+        matches = [
+            date_format for date_format in DATE_FORMATS
+            if pd.to_datetime(text, format=date_format, errors='coerce').notna().all()
+        ]
+        return matches[0] if len(matches) == 1 else None
+
+    def apply_column_types(self, df, column_types, date_formats=None, max_category_ratio=0.5):
+        """
+        Converts DataFrame columns to their inferred types, keeping the original values of any column
+        whose full contents do not fit the type inferred from the sample.
+
+        Parameters:
+        df (pandas.DataFrame): The DataFrame to convert.
+        column_types (dict): A dictionary of column names with their inferred types.
+        date_formats (dict): A dictionary of date column names with the format that parses them.
+        max_category_ratio (float): The highest distinct-to-total ratio for a string column to be encoded.
+
+        Returns:
+        tuple: The converted DataFrame, a dictionary of column names with their declared SQLite types,
+        and a dictionary of dictionary-encoded column names with their ordered lookup values.
+        """
+        df = df.copy()
+        declared_types = {}
+        lookups = {}
+        date_formats = date_formats or {}
+
+        for column, column_type in column_types.items():
+            values = df[column]
+            try:
+                if column_type == 'INTEGER':
+                    numbers = pd.to_numeric(values, errors='raise')
+                    if not (numbers.dropna() == numbers.dropna().round()).all():
+                        raise ValueError(f"Column '{column}' contains non-integral values.")
+                    df[column] = numbers.astype('Int64')
+                elif column_type == 'REAL':
+                    df[column] = pd.to_numeric(values, errors='raise').astype(float)
+                elif column_type == 'DATE':
+                    if date_formats.get(column) is None:
+                        dates = values
+                    else:
+                        text = values.dropna().astype(str).str.strip()
+                        dates = pd.to_datetime(text, format=date_formats[column], errors='raise').reindex(values.index)
+                    # ISO text keeps microseconds but cannot hold nanoseconds or a timezone offset
+                    if dates.dt.tz is not None or (dates.dropna().dt.nanosecond != 0).any():
+                        raise ValueError(f"Column '{column}' cannot be stored as ISO dates without losing precision.")
+                    has_time = (dates.dropna() != dates.dropna().dt.normalize()).any()
+                    has_fraction = (dates.dropna().dt.microsecond != 0).any()
+                    iso_format = '%Y-%m-%d %H:%M:%S.%f' if has_fraction else '%Y-%m-%d %H:%M:%S' if has_time else '%Y-%m-%d'
+                    df[column] = dates.dt.strftime(iso_format).astype(object).where(dates.notna(), None)
+                    column_type = 'TEXT'
+                elif column_type == 'CATEGORY':
+                    codes, categories = pd.factorize(values.astype(object).where(values.notna(), None))
+                    if len(categories) > max_category_ratio * values.notna().sum():
+                        raise ValueError(f"Column '{column}' has too many distinct values to encode.")
+                    df[column] = pd.Series(codes + 1, index=df.index).astype('Int64').where(codes >= 0)
+                    lookups[column] = list(categories)
+                    column_type = 'INTEGER'
+            except (ValueError, TypeError, OverflowError):
+                column_type = 'REAL' if pd.api.types.is_float_dtype(values) else 'TEXT'
+            declared_types[column] = column_type
+
+        return df, declared_types, lookups
+
+    def write_dataframe(self, conn, df, table_name, sample_size=1000, encode_categories=False):
+        """
+        Writes a DataFrame to a table with inferred column types, replacing any existing table.
+
+        Dictionary-encoded columns store an integer code that references the 'id' column of a
+        'lookup__<table_name>__<column>' table holding the original string in its 'value' column.
+        The lookup tables of a replaced table are dropped, whether or not the new data is encoded.
 
         Parameters:
+        conn (sqlite3.Connection): The connection to write to.
         df (pandas.DataFrame): The DataFrame containing the data.
         table_name (str): The name of the table to insert data into.
+        sample_size (int): The number of leading rows used to infer the column types.
+        encode_categories (bool): Whether repeated strings are dictionary-encoded into lookup tables.
+        """
+        column_types, date_formats = self.infer_column_types(df, sample_size, encode_categories)
+        df, declared_types, lookups = self.apply_column_types(df, column_types, date_formats)
+
+        if table_name.startswith(LOOKUP_TABLE_PREFIX):
+            raise Exception(f"Table names starting with '{LOOKUP_TABLE_PREFIX}' are reserved for lookup tables.")
+        self.drop_lookup_tables(conn, table_name)
+        if lookups:
+            conn.execute(f'CREATE TABLE IF NOT EXISTS "{LOOKUP_REGISTRY_TABLE}" '
+                         f'(table_name TEXT, column_name TEXT, lookup_table TEXT, PRIMARY KEY (table_name, column_name));')
+
+        for column, categories in lookups.items():
+            lookup_table = f"{LOOKUP_TABLE_PREFIX}{table_name}__{column}"
+            if conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?;", (lookup_table,)).fetchone():
+                raise Exception(f"Lookup table '{lookup_table}' already belongs to another table.")
+            conn.execute(f'CREATE TABLE "{lookup_table}" (id INTEGER PRIMARY KEY, value TEXT NOT NULL UNIQUE);')
+            conn.executemany(f'INSERT INTO "{lookup_table}" (id, value) VALUES (?, ?);',
+                             [(code, str(value)) for code, value in enumerate(categories, start=1)])
+            conn.execute(f'INSERT INTO "{LOOKUP_REGISTRY_TABLE}" (table_name, column_name, lookup_table) VALUES (?, ?, ?);',
+                         (table_name, column, lookup_table))
+
+        columns_str = ', '.join(f'"{column}" {declared_types[column]}' for column in df.columns)
+        conn.execute(f'DROP TABLE IF EXISTS "{table_name}";')
+        conn.execute(f'CREATE TABLE "{table_name}" ({columns_str});')
+        df.to_sql(table_name, conn, if_exists='append', index=False)
+        conn.commit()
+
+    def insert_dataframe_to_db(self, df, table_name, sample_size=1000, encode_categories=False):
+        """
+        Inserts a pandas DataFrame into the SQLite database with inferred column types.
+
+        Parameters:
+        df (pandas.DataFrame): The DataFrame containing the data.
+        table_name (str): The name of the table to insert data into.
+        sample_size (int): The number of leading rows used to infer the column types.
+        encode_categories (bool): Whether repeated strings are dictionary-encoded into lookup tables.
         """
         conn = self.connect()
-        df.to_sql(table_name, conn, if_exists='replace', index=False)
-        conn.commit()
+        self.write_dataframe(conn, df, table_name, sample_size, encode_categories)
+
+    def get_table_size(self, table_name, conn=None):
+        """
+        Measures the bytes used on disk by a table, including its indexes and lookup tables.
+
+        Parameters:
+        table_name (str): The name of the table to measure.
+        conn (sqlite3.Connection): The connection to read from, defaulting to the application database.
+
+        Returns:
+        int: The total size in bytes of the pages that belong to the table.
+        """
+        conn = conn or self.connect()
+        tables = [table_name] + list(self.get_encoded_columns(table_name, conn).values())
+        placeholders = ', '.join(['?'] * len(tables))
+        query = "SELECT COALESCE(SUM(pgsize), 0) FROM dbstat WHERE name IN " \
+                f"(SELECT name FROM sqlite_master WHERE tbl_name IN ({placeholders}));"
+        return conn.execute(query, tables).fetchone()[0]
+
+    def get_encoded_columns(self, table_name, conn=None):
+        """
+        Retrieves the dictionary-encoded columns of a table.
+
+        Parameters:
+        table_name (str): The name of the table.
+        conn (sqlite3.Connection): The connection to read from, defaulting to the application database.
+
+        Returns:
+        dict: A dictionary of encoded column names with the name of their lookup table.
+        """
+        conn = conn or self.connect()
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?;", (LOOKUP_REGISTRY_TABLE,)).fetchone():
+            return {}
+        query = f'SELECT column_name, lookup_table FROM "{LOOKUP_REGISTRY_TABLE}" WHERE table_name = ?;'
+        return dict(conn.execute(query, (table_name,)).fetchall())
+
+    def drop_lookup_tables(self, conn, table_name):
+        """
+        Drops the lookup tables of a table and removes them from the registry. Callers that rewrite a table
+        from decoded data must do this first, since its columns no longer hold category codes.
+
+        Parameters:
+        conn (sqlite3.Connection): The connection to write to.
+        table_name (str): The name of the table whose lookup tables are dropped.
+        """
+        encoded_columns = self.get_encoded_columns(table_name, conn)
+        for lookup_table in encoded_columns.values():
+            conn.execute(f'DROP TABLE IF EXISTS "{lookup_table}";')
+        if encoded_columns:
+            conn.execute(f'DELETE FROM "{LOOKUP_REGISTRY_TABLE}" WHERE table_name = ?;', (table_name,))
+
+    def compare_ingest_storage(self, df, table_name, sample_size=1000, encode_categories=False):
+        """
+        Compares the storage size and full-scan time of a DataFrame written with inferred column types
+        against a plain pandas write, using in-memory databases. This writes the data twice more, so it
+        is meant as an opt-in benchmark rather than part of every upload.
+
+        Parameters:
+        df (pandas.DataFrame): The DataFrame containing the data.
+        table_name (str): The name of the table to write.
+        sample_size (int): The number of leading rows used to infer the column types.
+        encode_categories (bool): Whether repeated strings are dictionary-encoded into lookup tables.
+
+        Returns:
+        dict: The table sizes in bytes as measured by get_table_size, the bytes saved, the scan times in seconds and the scan speedup.
+        """
+        report = {}
+        for label in ('plain', 'typed'):
+            conn = sqlite3.connect(':memory:')
+            if label == 'plain':
+                df.to_sql(table_name, conn, if_exists='replace', index=False)
+            else:
+                self.write_dataframe(conn, df, table_name, sample_size, encode_categories)
+            table_bytes = self.get_table_size(table_name, conn)
+            scan_times = []
+            for _ in range(3):
+                start = time.perf_counter()
+                conn.execute(f'SELECT * FROM "{table_name}";').fetchall()
+                scan_times.append(time.perf_counter() - start)
+            conn.close()
+            report[f'{label}_bytes'] = table_bytes
+            report[f'{label}_scan_seconds'] = min(scan_times)
+
+        report['bytes_saved'] = report['plain_bytes'] - report['typed_bytes']
+        report['scan_speedup'] = report['plain_scan_seconds'] / max(report['typed_scan_seconds'], 1e-9)
+        return report
 
     def clear_table(self, table_name):
         """
@@ -250,11 +683,9 @@ class SQLiteDB:
         pd.DataFrame: A DataFrame containing table, column names, and data types.
         """
         conn = self.connect()
-        query_metadata = "SELECT name FROM sqlite_master WHERE type='table';"
-        tables_df = pd.read_sql_query(query_metadata, conn)
         metadata = []
 
-        for table in tables_df['name']:
+        for table in self.get_tables():
             columns_query = f'PRAGMA table_info("{table}");'
             columns_df = pd.read_sql_query(columns_query, conn)
             for _, row in columns_df.iterrows():
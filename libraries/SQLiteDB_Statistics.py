@@ -1,3 +1,4 @@
+from statistics import NormalDist
 import numpy as np
 import pandas as pd
 from .SQLiteDB import SQLiteDB
@@ -8,25 +9,62 @@ class SQLiteDB_Statistics:
     
     def get_summary_statistics(self, table_name):
         """Fetch summary statistics (min, Q1, median, mode, Q3, max, std dev) for a table."""
-        query = f"SELECT * FROM {table_name};"
-        df = self.db.fetch_query(query)
+        df = self.db.fetch_table(table_name)
 
         # Compute statistics
         stats = {}
         for column in df.select_dtypes(include=np.number).columns:
-            stats[column] = {
-                'min': df[column].min(),
-                'Q1': df[column].quantile(0.25),
-                'median': df[column].median(),
-                'mode': df[column].mode()[0] if not df[column].mode().empty else np.nan,
-                'Q3': df[column].quantile(0.75),
-                'max': df[column].max(),
-                'std_dev': df[column].std()
-            }
+            stats[column] = self.get_column_statistics(df[column])
         return stats
 
+    def get_column_statistics(self, series):
+        """Compute min, Q1, median, mode, Q3, max and std dev for one numeric column."""
+        mode = series.mode()
+        return {
+            'min': series.min(),
+            'Q1': series.quantile(0.25),
+            'median': series.median(),
+            'mode': mode[0] if not mode.empty else np.nan,
+            'Q3': series.quantile(0.75),
+            'max': series.max(),
+            'std_dev': series.std()
+        }
+
+    def get_approximate_summary_statistics(self, table_name, sample_size=10000, confidence=0.95):
+        """
+        Estimate summary statistics for a table from a random sample of its rows.
+
+        Returns the statistics in the same layout as get_summary_statistics, with an 'intervals' entry
+        per column holding confidence intervals for Q1, median, Q3 and std dev, and a dict describing
+        the sample as returned by SQLiteDB.sample_table, plus its 'confidence'.
+        """
+        df, sample_info = self.db.sample_table(table_name, sample_size)
+        sample_info['confidence'] = confidence
+        z = NormalDist().inv_cdf((1 + confidence) / 2)
+
+        stats = {}
+        for column in df.select_dtypes(include=np.number).columns:
+            stats[column] = self.get_column_statistics(df[column])
+            values = np.sort(df[column].dropna().to_numpy())
+            n = len(values)
+            intervals = {}
+            if n > 1 and not sample_info['exact']:
+                for name, q in (('Q1', 0.25), ('median', 0.5), ('Q3', 0.75)):
+                    # Distribution-free interval from the order statistics around the sample quantile
+                    spread = z * np.sqrt(n * q * (1 - q))
+                    lower = int(max(np.floor(n * q - spread), 0))
+                    upper = int(min(np.ceil(n * q + spread), n - 1))
+                    intervals[name] = (values[lower], values[upper])
+                std_dev = stats[column]['std_dev']
+                if n > 3 and std_dev > 0:
+                    # Kurtosis-adjusted standard error, which stays valid for heavy-tailed data
+                    kurtosis = np.mean((values - values.mean()) ** 4) / std_dev ** 4
+                    std_error = std_dev / 2 * np.sqrt(max(kurtosis - (n - 3) / (n - 1), 0.0) / n)
+                    intervals['std_dev'] = (max(std_dev - z * std_error, 0.0), std_dev + z * std_error)
+            stats[column]['intervals'] = intervals
+
+        return stats, sample_info
+
     def get_tables(self):
         """Fetch all table names from the database."""
-        query = "SELECT name FROM sqlite_master WHERE type='table';"
-        tables_df = self.db.fetch_query(query)
-        return tables_df['name'].tolist()
\ No newline at end of file
+        return self.db.get_tables()
\ No newline at end of file
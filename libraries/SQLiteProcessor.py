@@ -1,5 +1,6 @@
 import pandas as pd
 import numpy as np
+from statistics import NormalDist
 from sklearn.preprocessing import StandardScaler
 from .SQLiteDB import SQLiteDB  # Importing shared functionality
 
@@ -16,10 +17,7 @@ class SQLiteProcessor:
         list: List of all table names in the database.
         """
         db = SQLiteDB(database_path)
-        conn = db.connect()
-        cursor = conn.cursor()
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-        tables = [row[0] for row in cursor.fetchall()]
+        tables = db.get_tables()
         db.close()
         return tables
     
@@ -36,11 +34,74 @@ class SQLiteProcessor:
         """
         db = SQLiteDB(database_path)
         conn = db.connect()
-        df = pd.read_sql(f"SELECT * FROM {table_name}", conn)
+        df = db.fetch_table(table_name)
         missing_values = df.isnull().sum().to_dict()
         db.close()
         return missing_values
     
+    def get_approximate_missing_values(self, database_path, table_name, sample_size=10000, confidence=0.95):
+        """
+        Estimates the missing values in a specified table from a random sample of its rows.
+
+        The missing fraction of each column gets a Wilson confidence interval. When the row count is itself
+        estimated, the count interval also covers its uncertainty, and both intervals are taken at a
+        Bonferroni-adjusted level so that together they hold at the requested confidence.
+
+        Parameters:
+        database_path (str): Path to the SQLite database.
+        table_name (str): Name of the table to analyze.
+        sample_size (int): The number of rows to sample.
+        confidence (float): The confidence level of the reported intervals.
+
+        Returns:
+        tuple: A dictionary where keys are column names and values are dictionaries with the estimated
+        'fraction' of missing values and its 'fraction_lower' and 'fraction_upper' bounds, and the estimated
+        'count' with its 'lower' and 'upper' bounds (the fraction and count are None when no rows were
+        sampled), and a dictionary describing the sample as returned by
+        SQLiteDB.sample_table, plus its 'confidence'.
+        """
+        db = SQLiteDB(database_path)
+        db.connect()
+        joint_confidence = 1 - (1 - confidence) / 2
+        df, sample_info = db.sample_table(table_name, sample_size, joint_confidence)
+        db.close()
+        sample_info['confidence'] = confidence
+
+        n = len(df)
+        z = NormalDist().inv_cdf((1 + confidence) / 2)
+        rows_known = sample_info['rows_lower'] == sample_info['rows_upper']
+        z_count = z if rows_known else NormalDist().inv_cdf((1 + joint_confidence) / 2)
+
+        missing_values = {}
+        for column, count in df.isnull().sum().items():
+            if sample_info['exact']:
+                fraction = count / n if n else 0.0
+                missing_values[column] = {
+                    'fraction': fraction, 'fraction_lower': fraction, 'fraction_upper': fraction,
+                    'count': int(count), 'lower': int(count), 'upper': int(count)
+                }
+                continue
+            if n == 0:
+                # An empty sample says nothing about the table, so the fraction and count are unknown
+                missing_values[column] = {
+                    'fraction': None, 'fraction_lower': 0.0, 'fraction_upper': 1.0,
+                    'count': None, 'lower': 0, 'upper': sample_info['rows_upper']
+                }
+                continue
+            fraction = count / n
+            fraction_lower, fraction_upper = db.wilson_interval(count, n, z)
+            count_lower, count_upper = db.wilson_interval(count, n, z_count)
+            missing_values[column] = {
+                'fraction': fraction,
+                'fraction_lower': fraction_lower,
+                'fraction_upper': fraction_upper,
+                'count': round(fraction * sample_info['estimated_rows']),
+                'lower': int(np.floor(count_lower * sample_info['rows_lower'])),
+                'upper': int(np.ceil(count_upper * sample_info['rows_upper']))
+            }
+
+        return missing_values, sample_info
+
     def create_dummy_variables(self, database_path, table_name, exclude_columns=[]):
         """
         Creates dummy variables for categorical columns in a specified table, excluding specific columns.
@@ -55,7 +116,7 @@ class SQLiteProcessor:
         """
         db = SQLiteDB(database_path)
         conn = db.connect()
-        df = pd.read_sql(f"SELECT * FROM {table_name}", conn)
+        df = db.fetch_table(table_name)
         
         excluded_df = df[exclude_columns]
         columns_to_encode = [col for col in df.columns if col not in exclude_columns]
@@ -64,6 +125,7 @@ class SQLiteProcessor:
         df_encoded = pd.get_dummies(df_to_encode)
         df_combined = pd.concat([df_encoded, excluded_df], axis=1)
         
+        db.drop_lookup_tables(conn, table_name)
         df_combined.to_sql(table_name, conn, if_exists='replace', index=False)
         db.close()
     
@@ -80,11 +142,12 @@ class SQLiteProcessor:
         """
         db = SQLiteDB(database_path)
         conn = db.connect()
-        df = pd.read_sql(f"SELECT * FROM {table_name}", conn)
+        df = db.fetch_table(table_name)
         
         df.replace(r'^\s*$', np.nan, regex=True, inplace=True)
         df.dropna(inplace=True)
         
+        db.drop_lookup_tables(conn, table_name)
         df.to_sql(table_name, conn, if_exists='replace', index=False)
         db.close()
     
@@ -102,13 +165,14 @@ class SQLiteProcessor:
         """
         db = SQLiteDB(database_path)
         conn = db.connect()
-        df = pd.read_sql(f"SELECT * FROM {table_name}", conn)
+        df = db.fetch_table(table_name)
         
         numeric_cols = df.select_dtypes(include=['float64', 'int64']).columns
         cols_to_scale = [col for col in numeric_cols if col not in exclude_columns]
         
         scaler = StandardScaler()
         df[cols_to_scale] = scaler.fit_transform(df[cols_to_scale])
+        db.drop_lookup_tables(conn, table_name)
         df.to_sql(table_name, conn, if_exists='replace', index=False)
         db.close()
 
@@ -131,7 +195,7 @@ class SQLiteProcessor:
         try:
             db = SQLiteDB(database_path)
             conn = db.connect()
-            df = pd.read_sql(f"SELECT * FROM {table_name}", conn)
+            df = db.fetch_table(table_name)
             df.columns = df.columns.str.strip()
             
             if column_name not in df.columns:
@@ -147,6 +211,7 @@ class SQLiteProcessor:
                     median_index = df[column_name].argsort().iloc[len(df) // 2]
                     df.at[median_index, new_column_name] = 0
             
+            db.drop_lookup_tables(conn, table_name)
             df.to_sql(table_name, conn, if_exists='replace', index=False)
             db.close()
             return "Success: Column converted and data saved to the database."